@@ -12,6 +12,8 @@ API Key is stored locally for easy use in future runs.
 
 
 import os
+from itertools import chain
+from typing import Iterator
 
 import typer
 
@@ -34,11 +36,11 @@ def get_completion(
     top_p: float,
     caching: bool,
     chat: str,
-):
+) -> Iterator[str]:
     api_host = config.get("OPENAI_API_HOST")
     api_key = config.get("OPENAI_API_KEY")
     client = OpenAIClient(api_host, api_key)
-    return client.get_completion(
+    completion = client.get_completion(
         message=prompt,
         model="gpt-3.5-turbo",
         temperature=temperature,
@@ -46,6 +48,8 @@ def get_completion(
         caching=caching,
         chat_id=chat,
     )
+    # Wait for the first chunk here, so spinner is shown until response starts streaming.
+    return chain([next(completion, "")], completion)
 
 
 def main(
@@ -94,7 +98,7 @@ def main(
         prompt, temperature, top_probability, cache, chat, spinner=spinner
     )
 
-    typer_writer(completion, code, shell, animation)
+    completion = typer_writer(completion, code, shell, animation)
     if shell and execute and typer.confirm("Execute shell command?"):
         os.system(completion)
 
@@ -1,12 +1,16 @@
-import json
+import os
 from hashlib import md5
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 from typing import List, Dict, Callable
 
+import orjson
+
 
 class Cache:
     """
-    Decorator class that adds caching functionality to a function.
+    Decorator class that adds caching functionality to a function,
+    which generates (streams) text in chunks.
     """
 
     def __init__(self, length: int, cache_path: Path) -> None:
@@ -23,21 +27,26 @@ class Cache:
         """
         The Cache decorator.
 
-        :param func: The function to cache.
-        :return: Wrapped function with caching.
+        :param func: The generator function to cache.
+        :return: Wrapped generator function with caching.
         """
         def wrapper(*args, **kwargs):
             if not kwargs.pop("caching", True):
-                return func(*args, **kwargs)
+                yield from func(*args, **kwargs)
+                return
             # Exclude self instance from hashing.
-            cache_key = md5(json.dumps((args[1:], kwargs)).encode('utf-8')).hexdigest()
+            cache_key = md5(orjson.dumps((args[1:], kwargs))).hexdigest()
             cache_file = self.cache_path / cache_key
             if cache_file.exists():
-                return json.loads(cache_file.read_text())
-            result = func(*args, **kwargs)
-            cache_file.write_text(json.dumps(result))
+                yield cache_file.read_text(encoding="utf-8")
+                return
+            result = ""
+            for chunk in func(*args, **kwargs):
+                result += chunk
+                yield chunk
+            # Cache only fully received results.
+            cache_file.write_text(result, encoding="utf-8")
             self._delete_oldest_files(self.length)
-            return result
         return wrapper
 
     def _delete_oldest_files(self, max_files) -> None:
@@ -47,14 +56,16 @@ class Cache:
         :param max_files: Integer, the maximum number of files to keep in the CACHE_DIR folder.
         """
         # Get all files in the folder.
-        files = self.cache_path.glob('*')
+        files = list(self.cache_path.glob('*'))
+        # Nothing to delete, skip stat of every file. This only helps while cache is filling up,
+        # once it is full every new entry exceeds the limit and all files are sorted below.
+        if len(files) <= max_files:
+            return
         # Sort files by last modification time in ascending order.
-        files = sorted(files, key=lambda f: f.stat().st_mtime)
-        # Delete the oldest files if the number of files exceeds the limit.
-        if len(files) > max_files:
-            num_files_to_delete = len(files) - max_files
-            for i in range(num_files_to_delete):
-                files[i].unlink()
+        files.sort(key=lambda f: f.stat().st_mtime)
+        # Delete the oldest files, which exceed the limit.
+        for file in files[:len(files) - max_files]:
+            file.unlink()
 
 
 class ChatCache:
@@ -62,9 +73,13 @@ class ChatCache:
     This class is used as a decorator for OpenAI chat API requests.
     The ChatCache class caches chat messages and keeps track of the
     conversation history. It is designed to store cached messages
-    in a specified directory and in JSON format.
+    in a specified directory and in JSON Lines format (message per line),
+    so new messages are appended without rewriting the whole chat.
     """
 
+    # Prefix of temporary files used to rewrite chats, excluded from list().
+    TEMP_FILE_PREFIX = ".tmp-"
+
     def __init__(self, length: int, storage_path: Path):
         """
         Initialize the ChatCache decorator.
@@ -79,7 +94,7 @@ class ChatCache:
         """
         The Cache decorator.
 
-        :param func: The chat function to cache.
+        :param func: The chat generator function to cache.
         :return: Wrapped function with chat caching.
         """
         def wrapper(*args, **kwargs):
@@ -87,25 +102,62 @@ class ChatCache:
             message = {"role": "user", "content": kwargs.pop("message")}
             if not chat_id:
                 kwargs["message"] = [message]
-                return func(*args, **kwargs)
-            kwargs["message"] = self._read(chat_id)
-            kwargs["message"].append(message)
-            response_text = func(*args, **kwargs)
-            kwargs["message"].append({"role": "assistant", "content": response_text})
-            self._write(kwargs["message"], chat_id)
-            return response_text
+                yield from func(*args, **kwargs)
+                return
+            history = self._read(chat_id)
+            kwargs["message"] = history + [message]
+            response_text = ""
+            for chunk in func(*args, **kwargs):
+                response_text += chunk
+                yield chunk
+            new_messages = [message, {"role": "assistant", "content": response_text}]
+            if len(history) + len(new_messages) > self.length:
+                # Rewrite file only when it has to be truncated.
+                self._write(history + new_messages, chat_id)
+            else:
+                self._append(new_messages, chat_id)
         return wrapper
 
     def _read(self, chat_id: str) -> List[Dict]:
         file_path = self.storage_path / chat_id
         if not file_path.exists():
             return []
-        parsed_cache = json.loads(file_path.read_text())
-        return parsed_cache if isinstance(parsed_cache, list) else []
+        messages = []
+        legacy_messages = None
+        # Parse line by line, without loading whole file into memory first.
+        with file_path.open("rb") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                parsed_line = orjson.loads(line)
+                if isinstance(parsed_line, list):
+                    legacy_messages = parsed_line
+                    break
+                messages.append(parsed_line)
+        if legacy_messages is not None:
+            # Chat stored before JSON Lines format, convert it once file is closed,
+            # since open file can't be replaced on Windows.
+            self._write(legacy_messages, chat_id)
+            return legacy_messages
+        return messages
 
     def _write(self, messages: List[Dict], chat_id: str):
         file_path = self.storage_path / chat_id
-        json.dump(messages[-self.length:], file_path.open("w"))
+        # Swap in fully written file, so interrupted rewrite doesn't lose the chat.
+        file = NamedTemporaryFile("wb", dir=self.storage_path, prefix=self.TEMP_FILE_PREFIX, delete=False)
+        try:
+            with file:
+                file.write(b"".join(orjson.dumps(message) + b"\n" for message in messages[-self.length:]))
+            os.replace(file.name, file_path)
+        except BaseException:
+            # Don't leave partially written temp file behind.
+            os.remove(file.name)
+            raise
+
+    def _append(self, messages: List[Dict], chat_id: str):
+        file_path = self.storage_path / chat_id
+        with file_path.open("ab") as file:
+            file.write(b"".join(orjson.dumps(message) + b"\n" for message in messages))
 
     def invalidate(self, chat_id: str):
         file_path = self.storage_path / chat_id
@@ -113,10 +165,10 @@ class ChatCache:
 
     def show(self, chat_id):
         messages = self._read(self.storage_path / chat_id)
-        return [f"{message['role']}: {message['content']}" for message in messages]
+        return (f"{message['role']}: {message['content']}" for message in messages)
 
     def list(self):
-        # Get all files in the folder.
-        files = self.storage_path.glob('*')
+        # Get all files in the folder, except temporary ones.
+        files = (f for f in self.storage_path.glob('*') if not f.name.startswith(self.TEMP_FILE_PREFIX))
         # Sort files by last modification time in ascending order.
         return sorted(files, key=lambda f: f.stat().st_mtime)
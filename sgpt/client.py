@@ -1,9 +1,14 @@
-import requests
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Generator, TYPE_CHECKING
+
+import orjson
 
 from sgpt import config, Cache, ChatCache
 
+if TYPE_CHECKING:
+    import requests
+
 
 CHAT_CACHE_LENGTH = int(config.get("CHAT_CACHE_LENGTH"))
 CHAT_CACHE_PATH = Path(config.get("CHAT_CACHE_PATH"))
@@ -12,6 +17,18 @@ CACHE_PATH = Path(config.get("CACHE_PATH"))
 REQUEST_TIMEOUT = int(config.get("REQUEST_TIMEOUT"))
 
 
+@lru_cache(maxsize=None)
+def _get_session() -> "requests.Session":
+    """
+    Shared across requests, so keep-alive connections are reused.
+    Requests is imported here, since it is slow to import and commands
+    like --list-chat or --show-chat don't make any API calls.
+    """
+    import requests  # pylint: disable=import-outside-toplevel
+
+    return requests.Session()
+
+
 class OpenAIClient:
     cache = Cache(CACHE_LENGTH, CACHE_PATH)
     chat_cache = ChatCache(CHAT_CACHE_LENGTH, CHAT_CACHE_PATH)
@@ -27,16 +44,16 @@ class OpenAIClient:
         model: str = "gpt-3.5-turbo",
         temperature: float = 1,
         top_probability: float = 1,
-    ) -> Dict:
+    ) -> Generator[str, None, None]:
         """
-        Make request to OpenAI ChatGPT API, read more:
+        Make streaming request to OpenAI ChatGPT API, read more:
         https://platform.openai.com/docs/api-reference/chat
 
         :param messages: List of messages {"role": user or assistant, "content": message_string}
         :param model: String gpt-3.5-turbo or gpt-3.5-turbo-0301
         :param temperature: Float in 0.0 - 1.0 range.
         :param top_probability: Float in 0.0 - 1.0 range.
-        :return: Response body JSON.
+        :return: Generator of response message content chunks.
         """
         headers = {
             "Content-Type": "application/json",
@@ -47,13 +64,31 @@ class OpenAIClient:
             "model": model,
             "temperature": temperature,
             "top_p": top_probability,
+            "stream": True,
         }
         endpoint = f"{self.api_host}/v1/chat/completions"
-        response = requests.post(
-            endpoint, headers=headers, json=data, timeout=REQUEST_TIMEOUT
+        response = _get_session().post(
+            endpoint, headers=headers, data=orjson.dumps(data), timeout=REQUEST_TIMEOUT, stream=True
         )
         response.raise_for_status()
-        return response.json()
+        # Response is server-sent events, each "data: {...}" line holds a chunk, until "data: [DONE]".
+        for line in response.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            line = line[len(b"data: "):]
+            if line == b"[DONE]":
+                break
+            event = orjson.loads(line)
+            if "error" in event:
+                # Requests is already imported by _get_session() at this point.
+                from requests import HTTPError  # pylint: disable=import-outside-toplevel
+
+                error = event["error"]
+                message = error.get("message", error) if isinstance(error, dict) else error
+                raise HTTPError(f"OpenAI API error: {message}", response=response)
+            delta = event["choices"][0]["delta"]
+            if "content" in delta:
+                yield delta["content"]
 
     @chat_cache
     def get_completion(
@@ -63,18 +98,29 @@ class OpenAIClient:
         temperature: float = 1,
         top_probability: float = 1,
         caching: bool = True,
-    ) -> str:
+    ) -> Generator[str, None, None]:
         """
-        Generates single completion for prompt (message).
+        Generates single completion for prompt (message), streaming it in chunks.
 
         :param message: String prompt to generate completion for.
         :param model: String gpt-3.5-turbo or gpt-3.5-turbo-0301.
         :param temperature: Float in 0.0 - 1.0 range.
         :param top_probability: Float in 0.0 - 1.0 range.
         :param caching: Boolean value to enable/disable caching.
-        :return: String generated completion.
+        :return: Generator of string completion chunks.
         """
         # TODO: Move prompt context to system role when GPT-4 will be available over API.
-        return self._request(
-            message, model, temperature, top_probability, caching=caching
-        )["choices"][0]["message"]["content"].strip()
+        chunks = self._request(message, model, temperature, top_probability, caching=caching)
+        started = False
+        trailing = ""
+        for chunk in chunks:
+            # Skip leading whitespace, completion usually starts with new lines.
+            if not started:
+                chunk = chunk.lstrip()
+                started = bool(chunk)
+            # Hold whitespace back until more content arrives, so the end of completion is stripped.
+            text = trailing + chunk
+            content = text.rstrip()
+            trailing = text[len(content):]
+            if content:
+                yield content
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from getpass import getpass
-from tempfile import gettempdir
+from tempfile import gettempdir, NamedTemporaryFile
 
 from click import UsageError
 
@@ -53,12 +53,22 @@ def get(key: str) -> str:
 
 
 def _write() -> None:
-    with open(CONFIG_PATH, "w") as file:
-        for key, value in config.items():
-            # Write only keys which are not presented in ENV.
-            if key in os.environ:
-                continue
-            file.write(f"{key}={value}\n")
+    # Resolve symlinks, to replace the real file and keep the link (e.g. managed dotfiles).
+    config_path = CONFIG_PATH.resolve()
+    # Write to temp file in the same folder and swap it in, so config is never left half written.
+    file = NamedTemporaryFile("w", dir=config_path.parent, delete=False)
+    try:
+        with file:
+            for key, value in config.items():
+                # Write only keys which are not presented in ENV.
+                if key in os.environ:
+                    continue
+                file.write(f"{key}={value}\n")
+        os.replace(file.name, config_path)
+    except BaseException:
+        # Don't leave partially written temp file behind.
+        os.remove(file.name)
+        raise
 
 
 def put(key: str, value: str, write_file=True) -> None:
@@ -2,8 +2,6 @@ import platform
 from os import getenv
 from os.path import basename
 
-from distro import name as distro_name
-
 
 """
 This module makes a prompt for OpenAI requests with some context.
@@ -64,22 +62,27 @@ You must always follow them. No exceptions.
 Request: """
 
 
-def shell(question: str) -> str:
-    def os_name() -> str:
-        operating_systems = {
-            "Linux": "Linux/" + distro_name(pretty=True),
-            "Windows": "Windows " + platform.release(),
-            "Darwin": "Darwin/MacOS " + platform.mac_ver()[0],
-        }
-        return operating_systems.get(platform.system(), "Unknown")
+def os_name() -> str:
+    # Only the current platform is probed, distro reads OS release files.
+    # Distro is only used for shell prompts, no need to import it on every run.
+    from distro import name as distro_name  # pylint: disable=import-outside-toplevel
+
+    operating_systems = {
+        "Linux": lambda: "Linux/" + distro_name(pretty=True),
+        "Windows": lambda: "Windows " + platform.release(),
+        "Darwin": lambda: "Darwin/MacOS " + platform.mac_ver()[0],
+    }
+    return operating_systems.get(platform.system(), lambda: "Unknown")()
 
+
+def shell(question: str) -> str:
     shell = basename(getenv("SHELL", "PowerShell"))
     os = os_name()
     question = question.strip()
     if not question.endswith("?"):
         question += "?"
-    # TODO: Can be optimised.
-    return SHELL_PROMPT.replace("{shell}", shell).replace("{os}", os) + question
+    # Single formatting pass instead of copying whole prompt on each replace.
+    return SHELL_PROMPT.format(shell=shell, os=os) + question
 
 
 def code(question: str) -> str:
@@ -1,12 +1,11 @@
 import os
 from time import sleep
-from typing import Callable
+from typing import Callable, Iterable
 from tempfile import NamedTemporaryFile
 
 import typer
 
 from click import BadParameter
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from sgpt import OpenAIClient
 
 
@@ -20,6 +19,8 @@ def loading_spinner(func: Callable) -> Callable:
     def wrapper(*args, **kwargs):
         if not kwargs.pop("spinner"):
             return func(*args, **kwargs)
+        from rich.progress import Progress, SpinnerColumn, TextColumn  # pylint: disable=import-outside-toplevel
+
         text = TextColumn("[green]Consulting with robots...")
         with Progress(SpinnerColumn(), text, transient=True) as progress:
             progress.add_task("request")
@@ -38,37 +39,44 @@ def get_edited_prompt() -> str:
         # Create file and store path.
         file_path = file.name
     editor = os.environ.get("EDITOR", "vim")
-    # This will write text to file using $EDITOR.
-    os.system(f"{editor} {file_path}")
-    # Read file when editor is closed.
-    with open(file_path, "r") as file:
-        output = file.read()
-    os.remove(file_path)
+    try:
+        # This will write text to file using $EDITOR. Run through the shell, so $EDITOR
+        # may be a quoted path, include arguments or be a .cmd/.bat shim on Windows.
+        os.system(f'{editor} "{file_path}"')
+        # Read file when editor is closed.
+        with open(file_path, "r") as file:
+            output = file.read()
+    finally:
+        os.remove(file_path)
     if not output:
         raise BadParameter("Couldn't get valid PROMPT from $EDITOR")
     return output
 
 
-def typer_writer(text: str, code: bool, shell: bool, animate: bool) -> None:
+def typer_writer(chunks: Iterable[str], code: bool, shell: bool, animate: bool) -> str:
     """
-    Writes output to the console, with optional typewriter animation and color.
+    Writes output to the console as chunks arrive, with optional typewriter animation and color.
 
-    :param text: Text to output.
+    :param chunks: Text chunks to output.
     :param code: If content of text is code.
     :param shell: if content of text is shell command.
     :param animate: Enable/Disable typewriter animation.
-    :return: None
+    :return: String, whole written text.
     """
     shell_or_code = shell or code
     color = "magenta" if shell_or_code else None
-    if animate and not shell_or_code:
-        for char in text:
-            typer.secho(char, nl=False, fg=color, bold=shell_or_code)
-            sleep(0.015)
-        # Add new line at the end, to prevent % from appearing.
-        typer.echo("")
-        return
-    typer.secho(text, fg=color, bold=shell_or_code)
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if animate and not shell_or_code:
+            for char in chunk:
+                typer.secho(char, nl=False, fg=color, bold=shell_or_code)
+                sleep(0.015)
+            continue
+        typer.secho(chunk, nl=False, fg=color, bold=shell_or_code)
+    # Add new line at the end, to prevent % from appearing.
+    typer.echo("")
+    return text
 
 
 def echo_chat_messages(chat_id: str) -> None:
@@ -1,9 +1,13 @@
 import os
+import json
 import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
 import requests_mock
 import requests
 
-from sgpt import OpenAIClient
+from sgpt import OpenAIClient, Cache, ChatCache
 
 
 class TestMain(unittest.TestCase):
@@ -27,8 +31,10 @@ class TestMain(unittest.TestCase):
 
     @requests_mock.Mocker()
     def test_openai_request(self, mock):
-        mocked_json = {"choices": [{"message": {"content": self.response_text}}]}
-        mock.post(self.API_URL, json=mocked_json, status_code=200)
+        deltas = [{"role": "assistant"}, {"content": "\n\nPa"}, {"content": "ris"}, {"content": " \n"}, {}]
+        mocked_events = [f"data: {json.dumps({'choices': [{'delta': delta}]})}\n\n" for delta in deltas]
+        mocked_events.append("data: [DONE]\n\n")
+        mock.post(self.API_URL, text="".join(mocked_events), status_code=200)
         result = self.client.get_completion(
             message=self.prompt,
             model=self.model,
@@ -37,12 +43,13 @@ class TestMain(unittest.TestCase):
             caching=False,
             chat_id=None,
         )
-        self.assertEqual(result, self.response_text)
+        self.assertEqual("".join(result), self.response_text)
         expected_json = {
             "messages": [{"role": "user", "content": self.prompt}],
             "model": "gpt-3.5-turbo",
             "temperature": self.temperature,
             "top_p": self.top_p,
+            "stream": True,
         }
         expected_headers = {
             "Content-Type": "application/json",
@@ -57,7 +64,7 @@ class TestMain(unittest.TestCase):
     def test_openai_request_fail(self, mock):
         mock.post(self.API_URL, status_code=400)
         with self.assertRaises(requests.exceptions.HTTPError):
-            self.client.get_completion(
+            result = self.client.get_completion(
                 message=self.prompt,
                 model=self.model,
                 temperature=self.temperature,
@@ -65,6 +72,112 @@ class TestMain(unittest.TestCase):
                 caching=False,
                 chat_id=None
             )
+            # Request is made when response is consumed.
+            "".join(result)
+
+    @requests_mock.Mocker()
+    def test_openai_request_stream_error(self, mock):
+        mocked_events = [
+            f"data: {json.dumps({'choices': [{'delta': {'content': 'Pa'}}]})}\n\n",
+            f"data: {json.dumps({'error': {'message': 'The server had an error.'}})}\n\n",
+        ]
+        mock.post(self.API_URL, text="".join(mocked_events), status_code=200)
+        result = self.client.get_completion(
+            message=self.prompt,
+            model=self.model,
+            temperature=self.temperature,
+            top_probability=self.top_p,
+            caching=False,
+            chat_id=None
+        )
+        self.assertEqual(next(result), "Pa")
+        with self.assertRaisesRegex(requests.exceptions.HTTPError, "The server had an error."):
+            next(result)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache_path = Path(self.temp_dir.name)
+        self.calls = 0
+
+    def completion(self, *args, **kwargs):
+        self.calls += 1
+        yield from ["Pa", "ris"]
+
+    def test_cache_hit_returns_full_text(self):
+        cached_completion = Cache(10, self.cache_path)(self.completion)
+        self.assertEqual(list(cached_completion(None, "prompt")), ["Pa", "ris"])
+        self.assertEqual(list(cached_completion(None, "prompt")), ["Paris"])
+        self.assertEqual(self.calls, 1)
+
+    def test_interrupted_stream_is_not_cached(self):
+        cached_completion = Cache(10, self.cache_path)(self.completion)
+        result = cached_completion(None, "prompt")
+        self.assertEqual(next(result), "Pa")
+        result.close()
+        self.assertEqual(list(self.cache_path.iterdir()), [])
+        self.assertEqual(list(cached_completion(None, "prompt")), ["Pa", "ris"])
+        self.assertEqual(self.calls, 2)
+
+    def test_caching_disabled(self):
+        cached_completion = Cache(10, self.cache_path)(self.completion)
+        self.assertEqual(list(cached_completion(None, "prompt", caching=False)), ["Pa", "ris"])
+        self.assertEqual(list(self.cache_path.iterdir()), [])
+
+    def test_cache_non_ascii_completion(self):
+        def completion(*args, **kwargs):
+            yield from ["Příliš ", "žluťoučký 🐴"]
+
+        cached_completion = Cache(10, self.cache_path)(completion)
+        self.assertEqual("".join(cached_completion(None, "prompt")), "Příliš žluťoučký 🐴")
+        # Stored as UTF-8 regardless of locale encoding.
+        (cache_file,) = self.cache_path.iterdir()
+        self.assertEqual(cache_file.read_bytes(), "Příliš žluťoučký 🐴".encode("utf-8"))
+        self.assertEqual(list(cached_completion(None, "prompt")), ["Příliš žluťoučký 🐴"])
+
+
+class TestChatCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.chat_cache = ChatCache(10, Path(self.temp_dir.name))
+        self.chat_file = Path(self.temp_dir.name) / "chat"
+
+    @staticmethod
+    def completion(*args, message):
+        yield from ["Pa", "ris"]
+
+    def test_chat_written_after_stream(self):
+        chat_completion = self.chat_cache(self.completion)
+        result = chat_completion(None, message="Capital of France?", chat_id="chat")
+        self.assertEqual(next(result), "Pa")
+        self.assertFalse(self.chat_file.exists())
+        self.assertEqual(list(result), ["ris"])
+        expected_messages = [
+            {"role": "user", "content": "Capital of France?"},
+            {"role": "assistant", "content": "Paris"},
+        ]
+        self.assertEqual(self.chat_cache._read("chat"), expected_messages)
+
+    def test_interrupted_stream_is_not_written(self):
+        chat_completion = self.chat_cache(self.completion)
+        result = chat_completion(None, message="Capital of France?", chat_id="chat")
+        next(result)
+        result.close()
+        self.assertFalse(self.chat_file.exists())
+
+    def test_read_converts_json_list_chat(self):
+        messages = [
+            {"role": "user", "content": "Capital of France?"},
+            {"role": "assistant", "content": "Paris"},
+        ]
+        # Chat file format before JSON Lines.
+        self.chat_file.write_text(json.dumps(messages))
+        self.assertEqual(self.chat_cache._read("chat"), messages)
+        lines = self.chat_file.read_text().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], messages)
 
 
 if __name__ == "__main__":